@@ -22,6 +22,9 @@ from sage.misc.lazy_attribute import lazy_attribute
 from sage.structure.element import get_coercion_model
 from operator import mul
 from sage.categories.algebras import Algebras
+from sage.categories.lie_algebras_with_basis import LieAlgebrasWithBasis
+from sage.categories.finite_dimensional_lie_algebras_with_basis import (
+    FiniteDimensionalLieAlgebrasWithBasis)
 from sage.categories.triangular_kac_moody_algebras import TriangularKacMoodyAlgebras
 from sage.monoids.indexed_free_monoid import IndexedFreeAbelianMonoid
 from sage.combinat.free_module import CombinatorialFreeModule
@@ -102,11 +105,15 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
 
     .. TODO::
 
-        When the Lie algebra is finite dimensional, set the ordering of the
-        basis elements, translate the structure coefficients, and work with
-        fixed-length lists as the exponent vectors. This way we only will
-        run any nontrivial sorting only once and avoid other potentially
-        expensive comparisons between keys.
+        When the Lie algebra is finite dimensional, a compiled kernel could
+        straighten words over fixed-length exponent vectors with the
+        structure coefficients tabulated as integer-indexed arrays. The
+        sort keys, supports, and bracket coefficients are already cached
+        per monomial, so the remaining wins are in the monoid arithmetic
+        performed by the straightening worklist of :meth:`product_on_basis`.
+        Note that dense exponent vectors only pay off in compiled code;
+        in Python they lose to the sparse factor dicts once the dimension
+        grows past the support size of typical monomials.
     """
     @staticmethod
     def __classcall_private__(cls, g, basis_key=None, prefix='PBW', **kwds):
@@ -138,46 +145,16 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
             sage: TestSuite(U).run()
             sage: elts = [d[1], d[-1], d[2], d[-2]*d[1], d[-1]*d[1], d[3]^3*d[5], d['c']]
             sage: TestSuite(U).run(elements=elts)  # long time
-        """
-        if basis_key is not None:
-            self._basis_key = basis_key
-        else:
-            try:
-                self._basis_key = g._basis_key
-            except AttributeError:
-                self._basis_key_inverse = None
-
-        R = g.base_ring()
-        self._g = g
-        monomials = IndexedFreeAbelianMonoid(g.basis().keys(), prefix,
-                                             sorting_key=self._monoid_key, **kwds)
-        CombinatorialFreeModule.__init__(self, R, monomials,
-                                         prefix='', bracket=False, latex_bracket=False,
-                                         sorting_key=self._monomial_key,
-                                         category=Algebras(R).WithBasis().Filtered())
 
-    def _basis_key(self, x):
-        """
-        Return a key for sorting for the index ``x``.
-
-        TESTS::
+        Check that ``_basis_key`` is bound to a plain dict lookup when the
+        Lie algebra uses the default ordering of a finite basis::
 
             sage: L = lie_algebras.three_dimensional_by_rank(QQ, 3, names=['E','F','H'])
             sage: PBW = L.pbw_basis()
-            sage: PBW._basis_key('E') < PBW._basis_key('H')
+            sage: PBW._basis_key == L._basis_key_inverse.__getitem__
             True
-
-        ::
-
-            sage: L = lie_algebras.sl(QQ, 2)
-            sage: def neg_key(x):
-            ....:     return -L.basis().keys().index(x)
-            sage: PBW = L.pbw_basis(basis_key=neg_key)
-            sage: prod(PBW.gens())  # indirect doctest
-            PBW[-alpha[1]]*PBW[alphacheck[1]]*PBW[alpha[1]]
-             - 4*PBW[-alpha[1]]*PBW[alpha[1]]
-             + PBW[alphacheck[1]]^2
-             - 2*PBW[alphacheck[1]]
+            sage: PBW._basis_key('F')
+            1
 
         Check that :issue:`23266` is fixed::
 
@@ -194,16 +171,63 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
             ...
             KeyError: 3
         """
-        if self._basis_key_inverse is None:
-            K = self._g.basis().keys()
-            if isinstance(K, (list, tuple)) or K.cardinality() < float('inf'):
-                self._basis_key_inverse = {k: i for i,k in enumerate(K)}
-            else:
-                self._basis_key_inverse = False
-        if self._basis_key_inverse is False:
-            return x
+        # How to pack the secondary word of ``_monomial_key``; replaced by
+        #   a flat byte encoding below when the key values allow it
+        self._pack_word = tuple
+        if basis_key is not None:
+            self._basis_key = basis_key
         else:
-            return self._basis_key_inverse[x]
+            # ``_basis_key`` sits at the innermost level of ``_monomial_key``
+            #   and ``product_on_basis``, so when the Lie algebra uses one of
+            #   the category defaults, bind the underlying lookup directly to
+            #   avoid an extra method call on every invocation.  Binding the
+            #   callable per instance specializes harder than dispatching to
+            #   per-case subclasses could: there is no method frame left at
+            #   all, and it composes freely with the semisimple subclass
+            #   chosen in ``__classcall_private__``.
+            key = getattr(g, '_basis_key', None)
+            func = getattr(key, '__func__', None)
+            if func is FiniteDimensionalLieAlgebrasWithBasis.ParentMethods._basis_key:
+                # A dict is also the right container when the basis keys are
+                #   themselves small integers: their hash is the identity and
+                #   the lookup returns the stored (interned) value, whereas an
+                #   indexed array would box a fresh int on every access and
+                #   wrap around on negative indices
+                self._basis_key = g._basis_key_inverse.__getitem__
+                # The key values are 0, ..., n-1, so words of them compare
+                #   correctly as big-endian byte strings, i.e. via memcmp
+                n = len(g._basis_key_inverse)
+                if n <= 256:
+                    self._pack_word = bytes
+                elif n < 65536:
+                    from struct import pack
+
+                    def _pack_word(w):
+                        return pack('>%dH' % len(w), *w)
+                    self._pack_word = _pack_word
+            elif func is LieAlgebrasWithBasis.ParentMethods._basis_key:
+                self._basis_key = lambda x: x
+            elif key is not None:
+                self._basis_key = key
+            else:
+                self._basis_key = lambda x: x
+
+        R = g.base_ring()
+        self._g = g
+        self._monomial_key_cache = {}
+        self._product_cache = {}
+        self._trail_key_cache = {}
+        self._lead_key_cache = {}
+        self._bracket_cache = {}
+        self._rev_sorted_cache = {}
+        self._action_factors_cache = {}
+        self._gen_cache = {}
+        monomials = IndexedFreeAbelianMonoid(g.basis().keys(), prefix,
+                                             sorting_key=self._monoid_key, **kwds)
+        CombinatorialFreeModule.__init__(self, R, monomials,
+                                         prefix='', bracket=False, latex_bracket=False,
+                                         sorting_key=self._monomial_key,
+                                         category=Algebras(R).WithBasis().Filtered())
 
     def _monoid_key(self, x):
         """
@@ -247,7 +271,139 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
              + PBW[alphacheck[1]]^3 + 16*PBW[-alpha[1]]*PBW[alpha[1]]
              - 4*PBW[alphacheck[1]]^2 + 4*PBW[alphacheck[1]]
         """
-        return (-len(x), [self._basis_key(l) for l in x.to_word_list()])
+        # Sorting an n-term element invokes this O(n log n) times, often
+        #   repeatedly on the same monomial, so cache the computed keys.
+        key = self._monomial_key_cache.get(x)
+        if key is None:
+            # Translate each distinct generator once and repeat it by its
+            #   exponent rather than mapping _basis_key over the word list
+            word = []
+            for k, e in x._sorted_items():
+                word += (self._basis_key(k),) * e
+            key = (-len(x), self._pack_word(word))
+            self._monomial_key_cache[x] = key
+        return key
+
+    def _gen(self, k):
+        """
+        Return the generator of the underlying monoid indexed by ``k``.
+
+        TESTS::
+
+            sage: L = lie_algebras.three_dimensional_by_rank(QQ, 3, names=['E','F','H'])
+            sage: PBW = L.pbw_basis()
+            sage: PBW._gen('E') == PBW.indices().gen('E')
+            True
+            sage: PBW._gen('E') is PBW._gen('E')
+            True
+        """
+        g = self._gen_cache.get(k)
+        if g is None:
+            g = self._indices.gen(k)
+            self._gen_cache[k] = g
+        return g
+
+    @lazy_attribute
+    def _g_is_abelian(self):
+        """
+        Whether the defining Lie algebra is abelian.
+
+        TESTS::
+
+            sage: L = lie_algebras.abelian(QQ, 'x, y, z')
+            sage: PBW = L.pbw_basis()
+            sage: PBW._g_is_abelian
+            True
+            sage: L = lie_algebras.sl(QQ, 2)
+            sage: L.pbw_basis()._g_is_abelian
+            False
+        """
+        try:
+            return self._g.is_abelian()
+        except NotImplementedError:
+            # infinitely many generators; no fast path
+            return False
+
+    def _trailing_support_key(self, m):
+        """
+        Return the pair ``(s, k)``, where ``s`` is the trailing support
+        of the monomial ``m`` and ``k`` is its sorting key.
+
+        TESTS::
+
+            sage: L = lie_algebras.three_dimensional_by_rank(QQ, 3, names=['E','F','H'])
+            sage: PBW = L.pbw_basis()
+            sage: I = PBW.indices()
+            sage: PBW._trailing_support_key(I.gen('E') * I.gen('H')^2)
+            ('H', 2)
+        """
+        ret = self._trail_key_cache.get(m)
+        if ret is None:
+            s = m.trailing_support()
+            ret = (s, self._basis_key(s))
+            self._trail_key_cache[m] = ret
+        return ret
+
+    def _leading_support_key(self, m):
+        """
+        Return the pair ``(s, k)``, where ``s`` is the leading support
+        of the monomial ``m`` and ``k`` is its sorting key.
+
+        TESTS::
+
+            sage: L = lie_algebras.three_dimensional_by_rank(QQ, 3, names=['E','F','H'])
+            sage: PBW = L.pbw_basis()
+            sage: I = PBW.indices()
+            sage: PBW._leading_support_key(I.gen('E') * I.gen('H')^2)
+            ('E', 0)
+        """
+        ret = self._lead_key_cache.get(m)
+        if ret is None:
+            s = m.leading_support()
+            ret = (s, self._basis_key(s))
+            self._lead_key_cache[m] = ret
+        return ret
+
+    def _reversed_sorted_items(self, m):
+        """
+        Return the items of the monomial ``m`` in reversed sorted order
+        as a tuple.
+
+        TESTS::
+
+            sage: L = lie_algebras.three_dimensional_by_rank(QQ, 3, names=['E','F','H'])
+            sage: PBW = L.pbw_basis()
+            sage: I = PBW.indices()
+            sage: PBW._reversed_sorted_items(I.gen('E') * I.gen('H')^2)
+            (('H', 2), ('E', 1))
+        """
+        ret = self._rev_sorted_cache.get(m)
+        if ret is None:
+            ret = tuple(reversed(m._sorted_items()))
+            self._rev_sorted_cache[m] = ret
+        return ret
+
+    def _action_factors(self, m):
+        """
+        Return the factors of the monomial ``m``, as elements of the
+        defining Lie algebra, in the order in which they are applied
+        when acting on a vector (i.e., reversed and with multiplicities).
+
+        TESTS::
+
+            sage: L = lie_algebras.three_dimensional_by_rank(QQ, 3, names=['E','F','H'])
+            sage: PBW = L.pbw_basis()
+            sage: I = PBW.indices()
+            sage: PBW._action_factors(I.gen('E') * I.gen('H')^2)
+            (H, H, E)
+        """
+        ret = self._action_factors_cache.get(m)
+        if ret is None:
+            gen = self._g.monomial
+            ret = tuple(gen(k) for k, e in self._reversed_sorted_items(m)
+                        for _ in range(e))
+            self._action_factors_cache[m] = ret
+        return ret
 
     def _repr_(self):
         """
@@ -354,10 +510,8 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
         """
         if R == self._g:
             # Make this into the lift map
-            I = self._indices
-
             def basis_function(x):
-                return self.monomial(I.gen(x))
+                return self.monomial(self._gen(x))
 
             def inv_supp(m):
                 return None if m.length() != 1 else m.leading_support()
@@ -372,16 +526,27 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
 
         if isinstance(R, PoincareBirkhoffWittBasis):
             if self._g == R._g:
-                I = self._indices
+                memo = {}
 
                 def basis_function(x):
-                    return self.prod(self.monomial(I.gen(g)**e)
-                                     for g, e in x._sorted_items())
+                    # Morphism evaluation hits the same source monomials
+                    #   repeatedly, so remember the straightened products
+                    ret = memo.get(x)
+                    if ret is None:
+                        items = x._sorted_items()
+                        if not items:
+                            ret = self.one()
+                        else:
+                            g, e = items[0]
+                            ret = self.monomial(self._gen(g) ** e)
+                            for g, e in items[1:]:
+                                ret = ret * self.monomial(self._gen(g) ** e)
+                        memo[x] = ret
+                    return ret
                 # TODO: this diagonal, but with a smaller indexing set...
                 return R.module_morphism(basis_function, codomain=self)
             coerce_map = self._g.coerce_map_from(R._g)
             if coerce_map:
-                I = self._indices
                 lift = self.coerce_map_from(self._g)
 
                 def basis_function(x):
@@ -405,6 +570,7 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
         """
         return self._g
 
+    @cached_method
     def algebra_generators(self):
         """
         Return the algebra generators of ``self``.
@@ -415,6 +581,8 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
             sage: PBW = L.pbw_basis()
             sage: PBW.algebra_generators()
             Finite family {alpha[1]: PBW[alpha[1]], alphacheck[1]: PBW[alphacheck[1]], -alpha[1]: PBW[-alpha[1]]}
+            sage: PBW.algebra_generators() is PBW.algebra_generators()
+            True
         """
         G = self._indices.gens()
         return Family(self._indices._indices, lambda x: self.monomial(G[x]),
@@ -438,7 +606,6 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
         """
         return self._indices.one()
 
-    @cached_method
     def product_on_basis(self, lhs, rhs):
         """
         Return the product of the two basis elements ``lhs`` and ``rhs``.
@@ -485,27 +652,93 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
             PBW[(0, 0)]*PBW[(0, 1)]*PBW[(1, 0)]*PBW[(1, 1)]
              - PBW[(0, 0)]^2*PBW[(1, 1)] + PBW[(0, 0)]*PBW[(1, 1)]^2
         """
+        # The arguments have unique representation, so a plain dict avoids
+        #   the generic cache-key machinery of ``cached_method``
+        key = (lhs, rhs)
+        ret = self._product_cache.get(key)
+        if ret is not None:
+            return ret
+
         # Some trivial base cases
         if lhs == self.one_basis():
-            return self.monomial(rhs)
+            ret = self.monomial(rhs)
+            self._product_cache[key] = ret
+            return ret
         if rhs == self.one_basis():
-            return self.monomial(lhs)
-
-        I = self._indices
-        trail = lhs.trailing_support()
-        lead = rhs.leading_support()
-        if self._basis_key(trail) <= self._basis_key(lead):
-            return self.monomial(lhs * rhs)
-
-        # Create the commutator
-        # We have xy - yx = [x, y] -> xy = yx + [x, y] and we have x > y
-        terms = self._g.monomial(trail).bracket(self._g.monomial(lead))
-        lead = I.gen(lead)
-        trail = I.gen(trail)
-        mc = terms.monomial_coefficients(copy=False)
-        terms = self.sum_of_terms((I.gen(t), c) for t,c in mc.items())
-        terms += self.monomial(lead * trail)
-        return self.monomial(lhs // trail) * terms * self.monomial(rhs // lead)
+            ret = self.monomial(lhs)
+            self._product_cache[key] = ret
+            return ret
+
+        # When the Lie algebra is abelian, every word is normal ordered
+        if self._g_is_abelian:
+            ret = self.monomial(lhs * rhs)
+            self._product_cache[key] = ret
+            return ret
+
+        trail, trail_key = self._trailing_support_key(lhs)
+        lead, lead_key = self._leading_support_key(rhs)
+        if trail_key <= lead_key:
+            ret = self.monomial(lhs * rhs)
+            self._product_cache[key] = ret
+            return ret
+
+        # Straighten the word with an explicit worklist instead of recursing
+        #   through generic element products.  Each item is a tuple of
+        #   normal-ordered factors, keyed to the coefficient its product
+        #   carries; an out of order adjacent pair of letters is rewritten
+        #   using xy = yx + [x, y] (with x > y) until every item collapses
+        #   into a single normal-ordered monomial.  Keying the worklist by
+        #   the factors also merges items that arise along different
+        #   rewriting paths instead of processing them separately.
+        R = self.base_ring()
+        zero = R.zero()
+        acc = {}
+        work = {(lhs, rhs): R.one()}
+        while work:
+            factors, coeff = work.popitem()
+            if not coeff:
+                continue
+            # Greedily merge adjacent factors that are already in order
+            merged = [factors[0]]
+            for f in factors[1:]:
+                if self._trailing_support_key(merged[-1])[1] <= self._leading_support_key(f)[1]:
+                    merged[-1] = merged[-1] * f
+                else:
+                    merged.append(f)
+            if len(merged) == 1:
+                # Keep ``acc`` free of zero coefficients as we go, so the
+                #   final element construction can skip the zero filter
+                m = merged[0]
+                c = acc.get(m, zero) + coeff
+                if c:
+                    acc[m] = c
+                else:
+                    acc.pop(m, None)
+                continue
+            # The first two factors failed to merge, so rewrite across them
+            a, b = merged[0], merged[1]
+            rest = tuple(merged[2:])
+            trail = self._trailing_support_key(a)[0]
+            lead = self._leading_support_key(b)[0]
+            mc = self._bracket_cache.get((trail, lead))
+            if mc is None:
+                bracket = self._g.monomial(trail).bracket(self._g.monomial(lead))
+                mc = bracket.monomial_coefficients(copy=False)
+                self._bracket_cache[trail, lead] = mc
+            gt = self._gen(trail)
+            gl = self._gen(lead)
+            a = a // gt
+            b = b // gl
+            pref = () if a.is_one() else (a,)
+            suff = (() if b.is_one() else (b,)) + rest
+            item = pref + (gl * gt,) + suff
+            work[item] = work.get(item, zero) + coeff
+            for t, c in mc.items():
+                item = pref + (self._gen(t),) + suff
+                work[item] = work.get(item, zero) + coeff * c
+        ret = self._from_dict(acc, remove_zeros=False)
+        self._product_cache[key] = ret
+        return ret
 
     def degree_on_basis(self, m):
         """
@@ -560,10 +793,47 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
             Traceback (most recent call last):
             ...
             ValueError: the Lie algebra must be finite dimensional
+
+        Over `\ZZ`, the inverse of the Killing form has rational entries,
+        so the computation must fall back to the generic algorithm and
+        still produce an element with integer coefficients::
+
+            sage: L = lie_algebras.sl(ZZ, 2)
+            sage: U = L.pbw_basis()
+            sage: C = U.casimir_element()
+            sage: C.parent() is U
+            True
+            sage: all(g * C == C * g for g in U.algebra_generators())
+            True
         """
         from sage.rings.infinity import Infinity
         if self._g.dimension() == Infinity:
             raise ValueError("the Lie algebra must be finite dimensional")
+        if order == 2 and not args and not kwds:
+            # Compute C = sum(K[i,j] * X_i * X_j) directly: lift each basis
+            #   element once and accumulate the products into a single dict
+            #   instead of summing n^2 freshly coerced elements
+            try:
+                # The inverse may live over a larger ring (e.g. over QQ for
+                #   a Lie algebra defined over ZZ); coercing it back into
+                #   the base ring raises a TypeError when the quadratic
+                #   Casimir element is not defined over it
+                K = self._g.killing_form_matrix().inverse().change_ring(self.base_ring())
+            except (ValueError, TypeError, ZeroDivisionError):
+                # degenerate Killing form; solve the equations instead
+                return self._g.casimir_element(order=order, UEA=self,
+                                               force_generic=True)
+            gens = [self(x) for x in self._g.basis()]
+            zero = self.base_ring().zero()
+            d = {}
+            for i, x in enumerate(gens):
+                for j, y in enumerate(gens):
+                    c = K[i, j]
+                    if not c:
+                        continue
+                    for m, mc in (x * y).monomial_coefficients(copy=False).items():
+                        d[m] = d.get(m, zero) + c * mc
+            return self._from_dict(d)
         return self._g.casimir_element(order=order, UEA=self, *args, **kwds)
 
     def center(self):
@@ -615,15 +885,15 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
             if ret is not None:
                 return ret
             cm = get_coercion_model()
-            L = self.parent()._g
+            P = self.parent()
+            L = P._g
             if self_on_left:
                 if cm.discover_action(L, x.parent(), mul):
                     ret = x.parent().zero()
                     for mon, coeff in self._monomial_coefficients.items():
                         term = coeff * x
-                        for k, exp in reversed(mon._sorted_items()):
-                            for _ in range(exp):
-                                term = L.monomial(k) * term
+                        for gk in P._action_factors(mon):
+                            term = gk * term
                         ret += term
                     return ret
             else:
@@ -631,9 +901,8 @@ class PoincareBirkhoffWittBasis(CombinatorialFreeModule):
                     ret = x.parent().zero()
                     for mon, coeff in self._monomial_coefficients.items():
                         term = coeff * x
-                        for k, exp in reversed(mon._sorted_items()):
-                            for _ in range(exp):
-                                term = term * L.monomial(k)
+                        for gk in P._action_factors(mon):
+                            term = term * gk
                         ret += term
                     return ret
             return None